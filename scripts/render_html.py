@@ -21,14 +21,16 @@ Usage:
         --from-html-deck
 """
 
-import argparse
+import io
 import json
 import sys
 from pathlib import Path
 from html import escape
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Add project root to path when run as a script.  Library callers already
+# have ``src`` importable, so importing this module leaves sys.path alone.
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.schemas.design_system import DesignSystem
 from src.schemas.slide_schema import DeckSchema, SlideSpec
@@ -135,13 +137,10 @@ def generate_design_tokens_css(design: DesignSystem) -> str:
     return "\n".join(lines)
 
 
-def generate_auto_styling_css() -> str:
-    """Generate CSS rules that auto-apply branding per slide type and visual profile.
-
-    Uses gradients, accent bars, and visual structure to make the HTML preview
-    a richer approximation of the final branded presentation.
-    """
-    return """\
+# CSS rules that auto-apply branding per slide type and visual profile.
+# Uses gradients, accent bars, and visual structure to make the HTML preview
+# a richer approximation of the final branded presentation.
+_AUTO_STYLING_CSS = """\
 /* --- Auto-apply branded backgrounds per slide type --- */
 .slide[data-slide-type="title"] > .slide-bg-auto {
     background: linear-gradient(145deg, var(--bg-title) 0%, color-mix(in srgb, var(--bg-title) 85%, var(--color-primary)) 100%);
@@ -225,6 +224,15 @@ def generate_auto_styling_css() -> str:
 """
 
 
+def generate_auto_styling_css() -> str:
+    """Return the CSS rules that auto-apply branding per slide type and visual profile.
+
+    The rules only reference design tokens, so they are a module constant;
+    this wrapper is kept for callers that use the function form.
+    """
+    return _AUTO_STYLING_CSS
+
+
 # ---------------------------------------------------------------------------
 # Base CSS stylesheet (layout chrome, not brand-specific)
 # ---------------------------------------------------------------------------
@@ -587,28 +595,48 @@ def _map_role(zone_type: str) -> str:
     return mapping.get(zone_type, "body")
 
 
-def _content_for_role(role: str, spec: SlideSpec) -> str:
-    """Extract the best content string for a given role from the SlideSpec."""
-    if role == "title":
-        return spec.title or ""
-    elif role == "subtitle":
-        return spec.subtitle or ""
-    elif role == "data_point":
-        for block in spec.content_blocks:
-            if block.type == "data_point":
-                return block.content
-        return ""
-    elif role == "quote":
-        for block in spec.content_blocks:
-            if block.type == "quote":
-                return block.content
-        return ""
-    else:
-        parts = []
-        for block in spec.content_blocks:
-            if block.type in ("body", "bullets", "caption"):
-                parts.append(block.content)
-        return "\n\n".join(parts)
+_BODY_BLOCK_TYPES = ("body", "bullets", "caption")
+
+
+def _index_content_blocks(spec: SlideSpec) -> dict[str, str]:
+    """Resolve the content string for every role in one pass over the blocks.
+
+    Keys are ``title``, ``subtitle``, ``data_point``, ``quote`` and ``body``
+    (the combined body/bullets/caption text, used for every other role).
+    """
+    data_point = None
+    quote = None
+    body_parts = []
+    for block in spec.content_blocks:
+        if block.type in _BODY_BLOCK_TYPES:
+            body_parts.append(block.content)
+        elif block.type == "data_point":
+            if data_point is None:
+                data_point = block.content
+        elif block.type == "quote":
+            if quote is None:
+                quote = block.content
+    return {
+        "title": spec.title or "",
+        "subtitle": spec.subtitle or "",
+        "data_point": data_point or "",
+        "quote": quote or "",
+        "body": "\n\n".join(body_parts),
+    }
+
+
+def _content_for_role(
+    role: str, spec: SlideSpec, index: dict[str, str] | None = None
+) -> str:
+    """Extract the best content string for a given role from the SlideSpec.
+
+    Pass ``index`` (from ``_index_content_blocks``) to avoid rescanning the
+    content blocks when several roles are looked up for the same slide.
+    """
+    if index is None:
+        index = _index_content_blocks(spec)
+    content = index.get(role)
+    return index["body"] if content is None else content
 
 
 def _bullet_items_for_spec(spec: SlideSpec) -> list[str] | None:
@@ -621,6 +649,23 @@ def _bullet_items_for_spec(spec: SlideSpec) -> list[str] | None:
     return None
 
 
+def _layout_metrics(design: DesignSystem) -> tuple[float, float, float, float, float]:
+    """Resolve the content-area geometry (px at 96 DPI) once per deck.
+
+    Returns ``(margin_left, margin_top, content_width, slide_height,
+    margin_bottom)`` so per-slide composition doesn't re-walk the design
+    system for values that never change within a deck.
+    """
+    area = design.content_area
+    return (
+        area.margin_left * DPI,
+        area.margin_top * DPI,
+        (design.dimensions.width - area.margin_left - area.margin_right) * DPI,
+        design.dimensions.height * DPI,
+        area.margin_bottom * DPI,
+    )
+
+
 def deck_schema_to_html_deck(
     deck: DeckSchema,
     design: DesignSystem,
@@ -633,6 +678,7 @@ def deck_schema_to_html_deck(
         for m in matches:
             match_lookup[m["slide_number"]] = m
 
+    metrics = _layout_metrics(design)
     html_slides: list[HtmlSlide] = []
 
     for spec in deck.slides:
@@ -672,9 +718,11 @@ def deck_schema_to_html_deck(
             # the exact shape in the cloned slide. Content that doesn't map
             # to a zone is pushed to speaker notes.
             unmapped_content = []
+            content_index = _index_content_blocks(spec)
+            bullet_items_cache: list[str] | None = None
             for zone in template.content_zones:
                 role = _map_role(zone.zone_type)
-                content = _content_for_role(role, spec)
+                content = _content_for_role(role, spec, content_index)
                 if not content:
                     continue
 
@@ -687,11 +735,18 @@ def deck_schema_to_html_deck(
 
                 bullet_items = None
                 if role == "bullets":
-                    bullet_items = _bullet_items_for_spec(spec)
+                    if bullet_items_cache is None:
+                        bullet_items_cache = _bullet_items_for_spec(spec)
+                    bullet_items = bullet_items_cache
+
+                # Only slice when the zone limit actually truncates -- a
+                # no-op slice still copies the string.
+                if zone.max_chars and zone.max_chars < len(content):
+                    content = content[:zone.max_chars]
 
                 elements.append(TextElement(
                     role=role,
-                    content=content[:zone.max_chars] if zone.max_chars else content,
+                    content=content,
                     position=pos,
                     font=font,
                     shape_name=zone.shape_name,  # REQUIRED for clone mode
@@ -703,7 +758,7 @@ def deck_schema_to_html_deck(
             bg_color = _bg_color_for_type(spec.slide_type.value, design)
             bg = SlideBackground(bg_type="layout", color=bg_color)
             build_mode = "compose"
-            elements = _compose_elements(spec, design, visual_profile)
+            elements = _compose_elements(spec, design, visual_profile, metrics)
 
         # Validate contrast for all elements against the background
         for elem in elements:
@@ -811,20 +866,19 @@ def _compose_elements(
     spec: SlideSpec,
     design: DesignSystem,
     visual_profile: str,
+    metrics: tuple[float, float, float, float, float] | None = None,
 ) -> list[TextElement]:
     """Create elements for a compose-mode slide using design system defaults.
 
     Dynamically sizes textboxes based on content length and font size,
     and caps font sizes so text fits within the allocated space.
+    ``metrics`` is the precomputed result of ``_layout_metrics(design)``.
     """
     elements: list[TextElement] = []
-    ml = design.content_area.margin_left * DPI
-    mt = design.content_area.margin_top * DPI
-    content_w = (design.dimensions.width - design.content_area.margin_left - design.content_area.margin_right) * DPI
-    slide_h = design.dimensions.height * DPI
-    margin_bottom_px = design.content_area.margin_bottom * DPI
+    ml, mt, content_w, slide_h, margin_bottom_px = metrics or _layout_metrics(design)
 
     body_top = mt
+    content_index = _index_content_blocks(spec)
 
     if spec.title:
         font = _font_for_role("title", design, visual_profile)
@@ -872,7 +926,7 @@ def _compose_elements(
         ))
         body_top += sub_h + 10
 
-    body_content = _content_for_role("body", spec)
+    body_content = content_index["body"]
     bullet_items = _bullet_items_for_spec(spec)
     body_h = slide_h - body_top - margin_bottom_px
 
@@ -899,7 +953,7 @@ def _compose_elements(
             bullet_items=bullet_items,
         ))
 
-    data_text = _content_for_role("data_point", spec)
+    data_text = content_index["data_point"]
     if data_text:
         font = _font_for_role("data_point", design, visual_profile)
         data_h = 120
@@ -951,15 +1005,15 @@ def render_html(deck: HtmlDeck, design: DesignSystem | None = None) -> str:
     css_parts = [BASE_CSS]
     if design:
         css_parts.append(generate_design_tokens_css(design))
-        css_parts.append(generate_auto_styling_css())
+        css_parts.append(_AUTO_STYLING_CSS)
     css_parts.append(f".slide-wrapper {{ width: {slide_w}px; }}")
     css_parts.append(f".slide {{ width: {slide_w}px; height: {slide_h}px; }}")
     full_css = "\n\n".join(css_parts)
 
-    parts: list[str] = []
+    out = io.StringIO()
     subtitle_html = f"<p>{escape(deck.subtitle)}</p>" if deck.subtitle else ""
     slide_count = len(deck.slides)
-    parts.append(f"""<!DOCTYPE html>
+    out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="utf-8">
@@ -978,18 +1032,20 @@ def render_html(deck: HtmlDeck, design: DesignSystem | None = None) -> str:
 """)
 
     for slide in deck.slides:
-        parts.append(_render_slide(slide, slide_w, slide_h))
+        _render_slide_into(slide, slide_w, slide_h, out)
 
-    parts.append("</body>\n</html>\n")
-    return "".join(parts)
+    out.write("</body>\n</html>\n")
+    return out.getvalue()
 
 
-def _render_slide(slide: HtmlSlide, w: int, h: int) -> str:
-    """Render a single HtmlSlide to HTML."""
+def _render_slide_into(slide: HtmlSlide, w: int, h: int, out: io.StringIO) -> None:
+    """Render a single HtmlSlide to HTML, writing directly into ``out``."""
+    # visual_profile and build_mode are Literal-validated by HtmlSlide, so
+    # they are interpolated as-is; slide_type is a free-form string.
     attrs = [
         f'data-slide-number="{slide.slide_number}"',
         f'data-slide-type="{escape(slide.slide_type)}"',
-        f'data-visual-profile="{escape(slide.visual_profile)}"',
+        f'data-visual-profile="{slide.visual_profile}"',
         f'data-build-mode="{slide.build_mode}"',
     ]
     if slide.template_index is not None:
@@ -997,9 +1053,9 @@ def _render_slide(slide: HtmlSlide, w: int, h: int) -> str:
 
     attrs_str = " ".join(attrs)
 
-    parts: list[str] = []
-    parts.append(f'<div class="slide-wrapper">')
-    parts.append(f'<div class="slide" {attrs_str}>')
+    write = out.write
+    write('<div class="slide-wrapper">\n')
+    write(f'<div class="slide" {attrs_str}>\n')
 
     # Background
     bg = slide.background
@@ -1018,61 +1074,60 @@ def _render_slide(slide: HtmlSlide, w: int, h: int) -> str:
         if style_parts:
             bg_style = f' style="{"; ".join(style_parts)};"'
 
-        parts.append(
+        write(
             f'<div class="slide-bg slide-bg-template"'
             f' data-bg-type="template_clone"'
             f' data-template-file="{escape(bg.template_file)}"'
             f' data-slide-index="{bg.slide_index}"'
             f'{bg_style}'
-            f'></div>'
+            f'></div>\n'
         )
     elif bg.bg_type == "layout" and bg.color:
         # Compose mode: use a branded layout from the base template.
         # The builder creates a slide from a layout (master bg preserved,
         # no content shapes cloned).
-        parts.append(
+        write(
             f'<div class="slide-bg slide-bg-solid"'
             f' data-bg-type="layout"'
             f' style="background:{bg.color};"'
-            f'></div>'
+            f'></div>\n'
         )
     elif bg.bg_type == "solid" and bg.color:
-        parts.append(
+        write(
             f'<div class="slide-bg slide-bg-solid"'
             f' data-bg-type="solid"'
             f' style="background:{bg.color};"'
-            f'></div>'
+            f'></div>\n'
         )
     else:
         # Auto background from slide type
-        parts.append(
+        write(
             f'<div class="slide-bg slide-bg-auto"'
             f' data-bg-type="layout"'
-            f'></div>'
+            f'></div>\n'
         )
 
     # Elements
     for elem in slide.elements:
-        parts.append(_render_element(elem))
+        write(_render_element(elem))
+        write("\n")
 
     # Slide number badge
-    parts.append(f'<div class="slide-number-badge">{slide.slide_number}</div>')
+    write(f'<div class="slide-number-badge">{slide.slide_number}</div>\n')
 
     # Speaker notes (hidden)
     if slide.speaker_notes:
-        parts.append(f'<div class="speaker-notes">{escape(slide.speaker_notes)}</div>')
+        write(f'<div class="speaker-notes">{escape(slide.speaker_notes)}</div>\n')
 
-    parts.append('</div>')  # .slide
+    write('</div>\n')  # .slide
 
     # Label below slide
     label = f"Slide {slide.slide_number} — {slide.slide_type}"
     if slide.intent:
         label += f" — {slide.intent[:60]}"
-    parts.append(f'<div class="slide-label">{escape(label)}</div>')
+    write(f'<div class="slide-label">{escape(label)}</div>\n')
 
-    parts.append('</div>\n')  # .slide-wrapper
-
-    return "\n".join(parts)
+    write('</div>\n')  # .slide-wrapper
 
 
 def _render_element(elem: TextElement) -> str:
@@ -1153,6 +1208,8 @@ def _render_element(elem: TextElement) -> str:
 # ---------------------------------------------------------------------------
 
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(description="Render branded HTML slide deck")
     parser.add_argument("input_json", type=Path, help="Deck schema JSON or HtmlDeck JSON")
     parser.add_argument("-o", "--output", type=Path, default=Path("workspace/deck_preview.html"),
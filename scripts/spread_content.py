@@ -13,7 +13,6 @@ Usage:
 """
 
 import argparse
-import copy
 import json
 import math
 import sys
@@ -24,11 +23,51 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.schemas.slide_schema import DeckSchema
 
+try:
+    import orjson
+except ImportError:  # optional speed-up (the "fast" extra); see _write_json
+    orjson = None
+
+
+def _read_json(path: Path) -> dict:
+    """Load a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Write ``data`` as 2-space-indented UTF-8 JSON without a trailing newline.
+
+    Both paths emit non-ASCII text as raw UTF-8 rather than ``\\u`` escapes.
+    orjson raises TypeError on non-str dict keys where json would coerce
+    them; deck and density data always come from JSON, so keys are strings.
+    """
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
 # ---------------------------------------------------------------------------
 # Splitting strategies per content pattern
 # ---------------------------------------------------------------------------
 
 
+def _make_split_slide(slide_dict: dict, title: str, blocks: list[dict], index: int) -> dict:
+    """Build the ``index``-th slide of a split from a shallow copy of the original.
+
+    Only title, content_blocks and (for continuations) speaker_notes differ
+    between the pieces, so every other field is shared rather than deep-copied.
+    """
+    new_slide = dict(slide_dict)
+    new_slide["title"] = title + (" (cont.)" if index > 0 else "")
+    new_slide["content_blocks"] = blocks
+    if index > 0:
+        new_slide["speaker_notes"] = f"Continuation of: {title}"
+    return new_slide
+
+
 def _split_by_bullets(slide_dict: dict, max_per_slide: int = 4) -> list[dict]:
     """Split a slide with too many bullets into multiple slides.
 
@@ -62,26 +101,17 @@ def _split_by_bullets(slide_dict: dict, max_per_slide: int = 4) -> list[dict]:
 
     slides = []
     for i, chunk in enumerate(chunks):
-        new_slide = copy.deepcopy(slide_dict)
-        suffix = f" (cont.)" if i > 0 else ""
-        new_slide["title"] = title + suffix
-
         # Build content blocks: non-bullet blocks only on first slide, bullets on all
         new_blocks = []
         if i == 0:
-            new_blocks.extend(copy.deepcopy(non_bullet_blocks))
+            new_blocks.extend(dict(b) for b in non_bullet_blocks)
         new_blocks.append({
             "type": "bullets",
             "content": "\n".join(chunk),
             "emphasis": "normal",
         })
-        new_slide["content_blocks"] = new_blocks
-
         # Speaker notes: full notes only on first slide, abbreviated on rest
-        if i > 0:
-            new_slide["speaker_notes"] = f"Continuation of: {title}"
-
-        slides.append(new_slide)
+        slides.append(_make_split_slide(slide_dict, title, new_blocks, i))
 
     return slides
 
@@ -102,19 +132,10 @@ def _split_by_content_blocks(slide_dict: dict, max_blocks: int = 3) -> list[dict
         for i in range(0, len(content_blocks), max_blocks)
     ]
 
-    slides = []
-    for i, chunk in enumerate(chunks):
-        new_slide = copy.deepcopy(slide_dict)
-        suffix = f" (cont.)" if i > 0 else ""
-        new_slide["title"] = title + suffix
-        new_slide["content_blocks"] = copy.deepcopy(chunk)
-
-        if i > 0:
-            new_slide["speaker_notes"] = f"Continuation of: {title}"
-
-        slides.append(new_slide)
-
-    return slides
+    return [
+        _make_split_slide(slide_dict, title, [dict(b) for b in chunk], i)
+        for i, chunk in enumerate(chunks)
+    ]
 
 
 def _split_by_char_count(slide_dict: dict, max_chars: int = 400) -> list[dict]:
@@ -127,39 +148,27 @@ def _split_by_char_count(slide_dict: dict, max_chars: int = 400) -> list[dict]:
     title = slide_dict.get("title", "")
     title_chars = len(title or "")
 
-    if not content_blocks:
-        return [slide_dict]
+    block_lens = [len(b.get("content", "")) for b in content_blocks]
+    if title_chars + sum(block_lens) <= max_chars:
+        return [slide_dict]  # Already fits (or no blocks): no split needed
 
     slides = []
     current_blocks = []
     current_chars = title_chars
 
-    for block in content_blocks:
-        block_chars = len(block.get("content", ""))
+    for block, block_chars in zip(content_blocks, block_lens):
         if current_chars + block_chars > max_chars and current_blocks:
             # Start a new slide
-            new_slide = copy.deepcopy(slide_dict)
-            suffix = f" (cont.)" if slides else ""
-            new_slide["title"] = title + suffix
-            new_slide["content_blocks"] = current_blocks
-            if slides:
-                new_slide["speaker_notes"] = f"Continuation of: {title}"
-            slides.append(new_slide)
-            current_blocks = [copy.deepcopy(block)]
+            slides.append(_make_split_slide(slide_dict, title, current_blocks, len(slides)))
+            current_blocks = [dict(block)]
             current_chars = title_chars + block_chars
         else:
-            current_blocks.append(copy.deepcopy(block))
+            current_blocks.append(dict(block))
             current_chars += block_chars
 
     # Flush remaining blocks
     if current_blocks:
-        new_slide = copy.deepcopy(slide_dict)
-        suffix = f" (cont.)" if slides else ""
-        new_slide["title"] = title + suffix
-        new_slide["content_blocks"] = current_blocks
-        if slides:
-            new_slide["speaker_notes"] = f"Continuation of: {title}"
-        slides.append(new_slide)
+        slides.append(_make_split_slide(slide_dict, title, current_blocks, len(slides)))
 
     return slides if slides else [slide_dict]
 
@@ -184,6 +193,8 @@ def spread_slides(
     for report in density_reports:
         if report["status"] == "spread_candidate":
             spread_lookup[report["slide_number"]] = report
+    if not spread_lookup:
+        return deck_data, 0
 
     new_slides = []
     splits_made = 0
@@ -250,8 +261,8 @@ def main():
             sys.exit(1)
 
     # Load
-    deck_data = json.loads(args.deck_schema.read_text(encoding="utf-8"))
-    density_data = json.loads(args.density_report.read_text(encoding="utf-8"))
+    deck_data = _read_json(args.deck_schema)
+    density_data = _read_json(args.density_report)
     reports = density_data.get("reports", [])
 
     original_count = len(deck_data.get("slides", []))
@@ -278,7 +289,7 @@ def main():
 
     # Write
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(json.dumps(updated_data, indent=2), encoding="utf-8")
+    _write_json(args.output, updated_data)
     print(f"\nWritten to: {args.output}")
     print(f"Slides: {original_count} → {new_count} ({splits} slides split)")
     print(f"\nIMPORTANT: Re-run template matching after spreading:")
@@ -16,14 +16,14 @@ Schema names:
 """
 
 import argparse
-import json
 import sys
 from pathlib import Path
+from typing import NoReturn
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from src.schemas.slide_schema import ContentInventory, ContentMaturity, DeckPlan, DeckSchema
 from src.schemas.template_schema import TemplateRegistry
@@ -79,14 +79,16 @@ def main():
     schema_cls = SCHEMA_MAP[args.schema_name]
 
     try:
-        raw = args.json_file.read_text(encoding="utf-8")
-        data = json.loads(raw)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in {args.json_file}: {e}", file=sys.stderr)
-        sys.exit(1)
+        # Parse and validate in one pass over the bytes (no intermediate dict tree)
+        instance = schema_cls.model_validate_json(args.json_file.read_bytes())
+    except ValidationError as e:
+        first = e.errors()[0]
+        if first["type"] == "json_invalid":
+            print(f"Error: Invalid JSON in {args.json_file}: {first['msg']}", file=sys.stderr)
+            sys.exit(1)
+        _fail(args, e)
 
     try:
-        instance = schema_cls.model_validate(data)
         print(f"Validation PASSED: {args.json_file} conforms to {args.schema_name}")
 
         # Print summary info based on schema type
@@ -126,9 +128,13 @@ def main():
             print(f"  Total elements: {total_elements}")
 
     except Exception as e:
-        print(f"Validation FAILED: {args.json_file} does not conform to {args.schema_name}", file=sys.stderr)
-        print(f"  Error: {e}", file=sys.stderr)
-        sys.exit(1)
+        _fail(args, e)
+
+
+def _fail(args: argparse.Namespace, error: Exception) -> NoReturn:
+    print(f"Validation FAILED: {args.json_file} does not conform to {args.schema_name}", file=sys.stderr)
+    print(f"  Error: {error}", file=sys.stderr)
+    sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -9,10 +9,14 @@ the base template (inheriting master backgrounds) and compose content via the
 type-specific composer system.
 """
 
+import copy
+import functools
 import logging
 from pathlib import Path
+from typing import IO
 
 from pptx import Presentation
+from pptx.util import Centipoints, Emu, Pt
 
 from src.schemas.design_system import DesignSystem
 from src.schemas.slide_schema import DeckSchema, SlideSpec, SlideType
@@ -23,11 +27,34 @@ from src.pptx_engine.slide_operations import (
     clone_slide_as_is,
     open_base_template,
     create_presentation,
+    save_presentation,
 )
 from src.pptx_engine.text_operations import estimate_fit_font_size
 
 logger = logging.getLogger(__name__)
 
+_NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_NSMAP = {"a": _NS_A}
+_P_TAG = f"{{{_NS_A}}}p"
+_TEXT_RUN_TAGS = frozenset({f"{{{_NS_A}}}r", f"{{{_NS_A}}}br", f"{{{_NS_A}}}fld"})
+_OFF_CANVAS_LEFT = Emu(914400 * 20)  # 20 inches off-screen right
+_RPR_PATH = "a:p/a:r/a:rPr"
+
+
+@functools.lru_cache(maxsize=4096)
+def _truncate_at_word(text: str, max_chars: int) -> str:
+    """Cut ``text`` to ``max_chars``, preferring a word boundary, and add "...".
+
+    Cached because the same titles and bullets recur across the slides of a
+    deck that reuse one template.
+    """
+    truncated = text[:max_chars]
+    last_space = truncated.rfind(" ")
+    if last_space > max_chars * 0.6:
+        truncated = truncated[:last_space]
+
+    return truncated.rstrip() + "..."
+
 
 class SlideBuilderAgent:
     """Build a .pptx using clone-and-replace as primary mode.
@@ -43,12 +70,18 @@ class SlideBuilderAgent:
         self,
         deck_schema: DeckSchema,
         design_system: DesignSystem,
-        output_path: str | Path,
+        output_path: str | Path | IO[bytes],
         matches: list[dict] | None = None,
         template_registry: object | None = None,
         base_template: str | Path | None = None,
-    ) -> Path:
-        output_path = Path(output_path)
+    ) -> Path | IO[bytes]:
+        """Build the deck and save it to ``output_path``.
+
+        ``output_path`` may also be a writable binary stream (e.g. BytesIO)
+        for callers that never need the deck on disk; it is returned as-is.
+        """
+        if isinstance(output_path, (str, Path)):
+            output_path = Path(output_path)
 
         base_path = Path(base_template) if base_template else self.DEFAULT_BASE
         if base_path.exists():
@@ -62,6 +95,10 @@ class SlideBuilderAgent:
             for m in matches:
                 match_lookup[m["slide_number"]] = m
 
+        # Normalized content zones per template index, shared by every slide
+        # that clones the same template.
+        zone_specs_cache: dict[int, list[tuple]] = {}
+
         cloned = 0
         composed = 0
         for slide_spec in deck_schema.slides:
@@ -70,14 +107,19 @@ class SlideBuilderAgent:
             # --- Primary mode: clone template + replace content ---
             if match_info and match_info.get("match_type") == "use_as_is" and template_registry:
                 try:
-                    template = template_registry.templates[match_info["template_index"]]
+                    template_index = match_info["template_index"]
+                    template = template_registry.templates[template_index]
                     slide = clone_slide_as_is(
                         prs, template.template_file, template.slide_index
                     )
                     # Replace text using content zones if available, else heuristic
                     content_zones = getattr(template, "content_zones", None)
                     if content_zones:
-                        self._populate_with_zones(slide, slide_spec, content_zones)
+                        zone_specs = zone_specs_cache.get(template_index)
+                        if zone_specs is None:
+                            zone_specs = self._zone_specs(content_zones)
+                            zone_specs_cache[template_index] = zone_specs
+                        self._populate_with_zones(slide, slide_spec, zone_specs)
                     else:
                         self._populate_cloned_slide(slide, slide_spec, design_system)
 
@@ -99,7 +141,7 @@ class SlideBuilderAgent:
             self._build_composed_slide(prs, slide_spec, design_system)
             composed += 1
 
-        prs.save(str(output_path))
+        save_presentation(prs, output_path)
         logger.info(
             f"Saved: {output_path} ({cloned} cloned, {composed} composed, "
             f"{len(deck_schema.slides)} total)"
@@ -133,85 +175,98 @@ class SlideBuilderAgent:
     # Content zone-based text replacement
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _zone_specs(content_zones: list) -> list[tuple[str, str, dict, int | None]]:
+        """Normalize content zones to ``(zone_type, shape_name, size_kwargs, max_chars)``.
+
+        Zones may be ContentZone models or plain dicts; resolving them once per
+        template keeps the per-slide loop free of attribute probing.
+        """
+        specs = []
+        for zone in content_zones:
+            if isinstance(zone, dict):
+                zone_type = zone.get("zone_type", "body")
+                shape_name = zone.get("shape_name", "")
+                font_range = zone.get("font_size_range")
+                max_chars = zone.get("max_chars")
+            else:
+                zone_type = zone.zone_type
+                shape_name = zone.shape_name
+                font_range = getattr(zone, "font_size_range", None)
+                max_chars = getattr(zone, "max_chars", None)
+
+            size_kwargs = {}
+            if font_range and len(font_range) == 2:
+                size_kwargs["min_font_pt"] = font_range[0]
+                size_kwargs["max_font_pt"] = font_range[1]
+
+            specs.append((zone_type, shape_name, size_kwargs, max_chars))
+        return specs
+
     def _populate_with_zones(
         self,
         slide,
         spec: SlideSpec,
-        content_zones: list,
+        zone_specs: list[tuple[str, str, dict, int | None]],
     ) -> None:
         """Replace text in cloned slide using content zone map.
 
         Content zones precisely identify which shapes hold replaceable text
         and what type of content they expect (title, body, subtitle, etc.).
-        After mapping, ALL unmapped text shapes have their text cleared.
+        ``zone_specs`` comes from :meth:`_zone_specs`.  After mapping, ALL
+        unmapped text shapes have their text cleared.
         """
-        title_text = spec.title or ""
-        body_text = self._get_combined_body(spec)
-        subtitle_text = spec.subtitle or ""
-        data_text = self._get_data_point_text(spec)
-
-        # Build a shape name → shape lookup
+        title_text, subtitle_text, body_text, data_text = self._extract_texts(spec)
+        zone_text = {
+            "title": title_text,
+            "subtitle": subtitle_text,
+            "data_point": data_text,
+            "body": body_text,
+            "bullet_area": body_text,
+            "caption": body_text,
+        }
+
+        # One pass over the shape tree: index only the shapes a zone targets,
+        # and remember every text shape for the clearing step below.
+        target_names = {zone[1] for zone in zone_specs}
         shape_lookup = {}
+        text_shapes = []
         for shape in slide.shapes:
-            shape_lookup[shape.name] = shape
+            name = shape.name
+            if name in target_names:
+                shape_lookup[name] = shape
+            if shape.has_text_frame:
+                text_shapes.append((name, shape))
 
         mapped_names: set[str] = set()
 
-        for zone in content_zones:
-            zone_type = zone.zone_type if hasattr(zone, "zone_type") else zone.get("zone_type", "body")
-            shape_name = zone.shape_name if hasattr(zone, "shape_name") else zone.get("shape_name", "")
+        for zone_type, shape_name, size_kwargs, max_chars in zone_specs:
+            text = zone_text.get(zone_type)
+            if not text:
+                continue
 
             shape = shape_lookup.get(shape_name)
             if not shape or not shape.has_text_frame:
                 continue
 
-            # Extract font size range from zone metadata
-            font_range = None
-            if hasattr(zone, "font_size_range"):
-                font_range = zone.font_size_range
-            elif isinstance(zone, dict):
-                font_range = zone.get("font_size_range")
-
-            size_kwargs = {}
-            if font_range and len(font_range) == 2:
-                size_kwargs["min_font_pt"] = font_range[0]
-                size_kwargs["max_font_pt"] = font_range[1]
-
-            # Extract max_chars for truncation
-            max_chars = None
-            if hasattr(zone, "max_chars"):
-                max_chars = zone.max_chars
-            elif isinstance(zone, dict):
-                max_chars = zone.get("max_chars")
-
-            if zone_type == "title" and title_text:
-                text = self._truncate_to_fit(title_text, max_chars)
-                self._replace_shape_text(shape, text, **size_kwargs)
-                mapped_names.add(shape_name)
-            elif zone_type == "subtitle" and subtitle_text:
-                text = self._truncate_to_fit(subtitle_text, max_chars)
-                self._replace_shape_text(shape, text, **size_kwargs)
-                mapped_names.add(shape_name)
-            elif zone_type == "data_point" and data_text:
-                self._replace_shape_text(shape, data_text, **size_kwargs)
-                mapped_names.add(shape_name)
-            elif zone_type in ("body", "bullet_area", "caption") and body_text:
-                text = self._truncate_to_fit(body_text, max_chars)
-                self._replace_shape_text(shape, text, **size_kwargs)
-                mapped_names.add(shape_name)
+            # Data points are inserted verbatim (no max_chars truncation)
+            if zone_type != "data_point":
+                text = self._truncate_to_fit(text, max_chars)
+            self._replace_shape_text(shape, text, **size_kwargs)
+            mapped_names.add(shape_name)
 
         # Clear ALL unmapped text shapes to remove stale template text
-        for shape in slide.shapes:
-            if shape.has_text_frame and shape.name not in mapped_names:
+        for name, shape in text_shapes:
+            if name not in mapped_names:
                 self._clear_shape_text(shape)
 
     # ------------------------------------------------------------------
     # Heuristic text replacement for cloned slides
     # ------------------------------------------------------------------
 
-    # Minimum shape area (sq inches) to be considered a content shape.
-    # Smaller shapes are treated as decorative labels/badges.
-    _CONTENT_AREA_THRESHOLD = 1.5
+    # Minimum shape area (1.5 sq inches, in EMU²) to be considered a content
+    # shape. Smaller shapes are treated as decorative labels/badges.
+    _CONTENT_AREA_THRESHOLD = int(1.5 * 914400 * 914400)
 
     def _populate_cloned_slide(
         self,
@@ -227,38 +282,37 @@ class SlideBuilderAgent:
         3. Map deck content to content shapes by role (title, body, etc.)
         4. Clear text from ALL unmapped shapes — no stale template text
         """
-        title_text = spec.title or ""
-        subtitle_text = spec.subtitle or ""
-        body_text = self._get_combined_body(spec)
-        data_text = self._get_data_point_text(spec)
+        title_text, subtitle_text, body_text, data_text = self._extract_texts(spec)
 
-        # --- Collect all text shapes with metadata ---
-        all_text_shapes: list[dict] = []
+        # --- Collect all text shapes as (shape, max_font_pt, top, area) ---
+        # Geometry stays in integer EMU; run sizes are read straight from the
+        # <a:rPr sz> attributes (hundredths of a point) without run proxies.
+        all_text_shapes: list[tuple] = []
         for shape in slide.shapes:
             if not shape.has_text_frame:
                 continue
 
-            try:
-                w = shape.width / 914400 if shape.width else 0.0
-                h = shape.height / 914400 if shape.height else 0.0
-                top = shape.top / 914400 if shape.top else 0.0
-            except Exception:
-                w, h, top = 0.0, 0.0, 0.0
-
-            max_font = 0.0
-            for para in shape.text_frame.paragraphs:
-                for run in para.runs:
-                    if run.font.size:
-                        max_font = max(max_font, run.font.size.pt)
-
-            all_text_shapes.append({
-                "shape": shape,
-                "font_size": max_font,
-                "top": top,
-                "width": w,
-                "area": w * h,
-                "text": shape.text_frame.text.strip(),
-            })
+            # has_text_frame is True for every <p:sp>, even one without a
+            # <p:txBody>; such a shape simply has no run sizes to scan.
+            max_sz = 0
+            txBody = shape._element.txBody
+            if txBody is not None:
+                for rPr in txBody.iterfind(_RPR_PATH, _NSMAP):
+                    sz = rPr.get("sz")
+                    if sz is not None and int(sz) > max_sz:
+                        max_sz = int(sz)
+
+            # Read <a:off>/<a:ext> directly when the shape has its own
+            # geometry; placeholders without it inherit from the layout.
+            xfrm = shape._element.xfrm
+            if xfrm is not None and xfrm.off is not None and xfrm.ext is not None:
+                top = xfrm.off.y
+                area = xfrm.ext.cx * xfrm.ext.cy
+            else:
+                top = shape.top or 0
+                area = (shape.width or 0) * (shape.height or 0)
+
+            all_text_shapes.append((shape, max_sz / 100, top, area))
 
         if not all_text_shapes:
             return
@@ -266,19 +320,22 @@ class SlideBuilderAgent:
         # --- Classify: content shapes vs decorative ---
         content_shapes = [
             s for s in all_text_shapes
-            if s["area"] >= self._CONTENT_AREA_THRESHOLD
+            if s[3] >= self._CONTENT_AREA_THRESHOLD
         ]
         # If nothing qualifies as "content", treat the largest shapes as content
         if not content_shapes:
-            all_text_shapes.sort(key=lambda s: s["area"], reverse=True)
+            all_text_shapes.sort(key=lambda s: s[3], reverse=True)
             content_shapes = all_text_shapes[:3]
 
         # Sort content shapes: largest font first (title candidate), then by
         # vertical position (top shapes before bottom)
-        content_shapes.sort(key=lambda s: (-s["font_size"], s["top"]))
+        content_shapes.sort(key=lambda s: (-s[1], s[2]))
 
         # --- Map deck content to shapes ---
-        mapped_ids: set[int] = set()
+        # Roles take content shapes strictly in sorted order, so a cursor
+        # into content_shapes tracks what is still available.
+        n_content = len(content_shapes)
+        next_idx = 0
 
         # Design system guardrails for font size clamping
         title_max_pt = design.fonts.title_size or 44
@@ -286,62 +343,63 @@ class SlideBuilderAgent:
         subtitle_max_pt = design.fonts.subtitle_size or 28
 
         # Title → first content shape (largest font / topmost)
-        if title_text and content_shapes:
-            target = content_shapes[0]
+        if title_text and next_idx < n_content:
             self._replace_shape_text(
-                target["shape"], title_text,
+                content_shapes[next_idx][0], title_text,
                 max_font_pt=title_max_pt, min_font_pt=14,
             )
-            mapped_ids.add(id(target["shape"]))
-
-        remaining = [s for s in content_shapes if id(s["shape"]) not in mapped_ids]
+            next_idx += 1
 
         # Subtitle → next available content shape (if subtitle exists)
-        if subtitle_text and remaining:
-            target = remaining[0]
+        if subtitle_text and next_idx < n_content:
             self._replace_shape_text(
-                target["shape"], subtitle_text,
+                content_shapes[next_idx][0], subtitle_text,
                 max_font_pt=subtitle_max_pt, min_font_pt=12,
             )
-            mapped_ids.add(id(target["shape"]))
-            remaining = [s for s in remaining if id(s["shape"]) not in mapped_ids]
+            next_idx += 1
 
         # Data point → next available if we have one
-        if data_text and remaining:
-            target = remaining[0]
+        if data_text and next_idx < n_content:
             # Data points can be large — allow up to design system's data_point size
             dp_max = design.data_point_size_resolved or 60
             self._replace_shape_text(
-                target["shape"], data_text,
+                content_shapes[next_idx][0], data_text,
                 max_font_pt=dp_max, min_font_pt=20,
             )
-            mapped_ids.add(id(target["shape"]))
-            remaining = [s for s in remaining if id(s["shape"]) not in mapped_ids]
+            next_idx += 1
 
         # Body/bullets → distribute across remaining content shapes
-        if body_text and remaining:
+        if body_text and next_idx < n_content:
             # If multiple body shapes, split body text across them
             body_lines = body_text.split("\n\n")
-            for i, target in enumerate(remaining):
+            for i, target in enumerate(content_shapes[next_idx:]):
                 if i < len(body_lines):
                     self._replace_shape_text(
-                        target["shape"], body_lines[i],
+                        target[0], body_lines[i],
                         max_font_pt=body_max_pt, min_font_pt=10,
                     )
                 else:
                     # Ran out of content blocks — clear this shape
-                    self._clear_shape_text(target["shape"])
-                mapped_ids.add(id(target["shape"]))
+                    self._clear_shape_text(target[0])
+            next_idx = n_content
 
         # --- Clear ALL unmapped text shapes ---
+        mapped_ids = {id(s[0]) for s in content_shapes[:next_idx]}
         for s in all_text_shapes:
-            if id(s["shape"]) not in mapped_ids:
-                self._clear_shape_text(s["shape"])
+            if id(s[0]) not in mapped_ids:
+                self._clear_shape_text(s[0])
 
     # ------------------------------------------------------------------
     # Shape text operations
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _remove_extra_paragraphs(tf) -> None:
+        """Drop every ``<a:p>`` in the text frame except the first."""
+        txBody = tf._element
+        for p_el in txBody.findall(_P_TAG)[1:]:
+            txBody.remove(p_el)
+
     @staticmethod
     def _replace_shape_text(
         shape,
@@ -364,29 +422,27 @@ class SlideBuilderAgent:
         if not tf.paragraphs:
             return
 
-        # Preserve formatting from the first run of the first paragraph
+        # Preserve formatting from the first run of the first paragraph,
+        # read straight from its <a:rPr> rather than through Font proxies.
+        # Colors are deliberately not carried over (see below).
         first_para = tf.paragraphs[0]
         font_props = {}
-        if first_para.runs:
-            run = first_para.runs[0]
-            color_rgb = None
-            try:
-                if run.font.color and run.font.color.type is not None:
-                    color_rgb = run.font.color.rgb
-            except AttributeError:
-                pass  # SchemeColor — let theme handle it
-
-            font_props = {
-                "name": run.font.name,
-                "size": run.font.size,
-                "bold": run.font.bold,
-                "italic": run.font.italic,
-                "color": color_rgb,
-            }
+        src_runs = first_para._p.r_lst
+        if src_runs:
+            rPr = src_runs[0].rPr
+            if rPr is None:
+                font_props = {"name": None, "size": None, "bold": None, "italic": None}
+            else:
+                latin = rPr.latin
+                font_props = {
+                    "name": latin.typeface if latin is not None else None,
+                    "size": Centipoints(rPr.sz) if rPr.sz is not None else None,
+                    "bold": rPr.b,
+                    "italic": rPr.i,
+                }
 
         # --- Clamp font size to requested range ---
         if font_props.get("size"):
-            from pptx.util import Pt
             current_pt = font_props["size"].pt
             clamped_pt = current_pt
             if max_font_pt is not None and clamped_pt > max_font_pt:
@@ -412,31 +468,37 @@ class SlideBuilderAgent:
                 font_props["size"] = Pt(clamped_pt)
 
         # --- Clear ALL paragraphs beyond the first ---
-        p_elements = list(tf._element)
-        ns_a = "http://schemas.openxmlformats.org/drawingml/2006/main"
-        for p_el in p_elements:
-            if p_el.tag == f"{{{ns_a}}}p" and p_el is not first_para._element:
-                tf._element.remove(p_el)
+        SlideBuilderAgent._remove_extra_paragraphs(tf)
 
         # --- Set new text on the (now only) paragraph ---
         first_para.text = new_text
 
         # --- Reapply formatting ---
-        if font_props and first_para.runs:
-            for run in first_para.runs:
-                if font_props.get("name"):
-                    run.font.name = font_props["name"]
-                if font_props.get("size"):
-                    run.font.size = font_props["size"]
-                if font_props.get("bold") is not None:
-                    run.font.bold = font_props["bold"]
-                if font_props.get("italic") is not None:
-                    run.font.italic = font_props["italic"]
-                # Skip re-applying explicit RGB colors — let the
-                # theme/layout color inheritance work naturally.
-                # Forcing a hardcoded color from the source template
-                # causes white-on-white or black-on-black when the
-                # layout background differs from the source.
+        # Build the <a:rPr> once on the first new run, then copy it onto any
+        # further runs (one per line break in the new text).
+        new_runs = first_para._p.r_lst
+        if font_props and new_runs:
+            rPr = None
+            if font_props["name"]:
+                rPr = new_runs[0].get_or_add_rPr()
+                rPr.get_or_add_latin().typeface = font_props["name"]
+            if font_props["size"]:
+                rPr = new_runs[0].get_or_add_rPr()
+                rPr.sz = font_props["size"].centipoints
+            if font_props["bold"] is not None:
+                rPr = new_runs[0].get_or_add_rPr()
+                rPr.b = font_props["bold"]
+            if font_props["italic"] is not None:
+                rPr = new_runs[0].get_or_add_rPr()
+                rPr.i = font_props["italic"]
+            if rPr is not None:
+                for r in new_runs[1:]:
+                    r.insert(0, copy.deepcopy(rPr))
+            # Skip re-applying explicit RGB colors — let the
+            # theme/layout color inheritance work naturally.
+            # Forcing a hardcoded color from the source template
+            # causes white-on-white or black-on-black when the
+            # layout background differs from the source.
 
     @staticmethod
     def _clear_shape_text(shape) -> None:
@@ -447,24 +509,23 @@ class SlideBuilderAgent:
         create empty boxes or overlap with content shapes.
         """
         tf = shape.text_frame
-        if not tf.paragraphs:
+        paras = tf._element.findall(_P_TAG)
+        if not paras:
             return
 
-        # Remove all paragraphs beyond the first
-        ns_a = "http://schemas.openxmlformats.org/drawingml/2006/main"
-        p_elements = list(tf._element)
-        first_p = tf.paragraphs[0]._element
-        for p_el in p_elements:
-            if p_el.tag == f"{{{ns_a}}}p" and p_el is not first_p:
-                tf._element.remove(p_el)
+        # A single paragraph without runs, breaks or fields is already clear
+        if len(paras) > 1 or any(child.tag in _TEXT_RUN_TAGS for child in paras[0]):
+            # Remove all paragraphs beyond the first
+            SlideBuilderAgent._remove_extra_paragraphs(tf)
 
-        # Clear the remaining paragraph
-        tf.paragraphs[0].text = ""
+            # Clear the remaining paragraph
+            tf.paragraphs[0].text = ""
 
-        # Move the shape off-canvas to prevent empty box artifacts
+        # Move the shape off-canvas to prevent empty box artifacts (even
+        # already-empty shapes can draw a fill or outline)
         try:
-            from pptx.util import Emu
-            shape.left = Emu(914400 * 20)  # 20 inches off-screen right
+            if shape.left != _OFF_CANVAS_LEFT:
+                shape.left = _OFF_CANVAS_LEFT
         except Exception:
             pass
 
@@ -481,39 +542,33 @@ class SlideBuilderAgent:
         """
         if max_chars is None or max_chars <= 0 or len(text) <= max_chars:
             return text
-
-        # Truncate at word boundary
-        truncated = text[:max_chars]
-        last_space = truncated.rfind(" ")
-        if last_space > max_chars * 0.6:
-            truncated = truncated[:last_space]
-
-        return truncated.rstrip() + "..."
+        return _truncate_at_word(text, max_chars)
 
     # ------------------------------------------------------------------
     # Content extraction helpers
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _get_combined_body(spec: SlideSpec) -> str:
-        """Extract body/bullet/caption text as a single string.
+    def _extract_texts(spec: SlideSpec) -> tuple[str, str, str, str]:
+        """Return ``(title, subtitle, body, data_point)`` text in one pass.
 
-        Content blocks are joined with double newlines so they can be
-        split apart when distributing across multiple shapes.
+        Body/bullet/caption blocks are joined with double newlines so they
+        can be split apart when distributing across multiple shapes.  The
+        data point is the first data_point block, if any.
         """
-        parts = []
+        body_parts = []
+        data_text = None
         for block in spec.content_blocks:
             if block.type in ("body", "caption", "bullets"):
-                parts.append(block.content)
-        return "\n\n".join(parts)
-
-    @staticmethod
-    def _get_data_point_text(spec: SlideSpec) -> str:
-        """Extract the data point text from content blocks."""
-        for block in spec.content_blocks:
-            if block.type == "data_point":
-                return block.content
-        return ""
+                body_parts.append(block.content)
+            elif block.type == "data_point" and data_text is None:
+                data_text = block.content
+        return (
+            spec.title or "",
+            spec.subtitle or "",
+            "\n\n".join(body_parts),
+            data_text or "",
+        )
 
     # ------------------------------------------------------------------
     # Speaker notes
@@ -12,9 +12,12 @@ The clone-based mode uses OPC-level part copying to preserve all visual elements
 """
 
 import copy
+import hashlib
 import logging
 import re
+import zipfile
 from pathlib import Path
+from typing import IO
 
 from lxml import etree
 from pptx import Presentation
@@ -25,6 +28,11 @@ from pptx.parts.slide import SlideLayoutPart, SlideMasterPart
 from pptx.slide import SlideLayout
 from pptx.util import Inches
 
+try:
+    from pptx.opc.serialized import PackageWriter, _ZipPkgWriter
+except ImportError:  # private python-pptx API; save_presentation falls back to prs.save()
+    PackageWriter = _ZipPkgWriter = None
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -35,6 +43,12 @@ _source_prs_cache: dict[str, Presentation] = {}
 _imported_layout_cache: dict[tuple[str, str], SlideLayout] = {}
 _imported_master_cache: dict[str, object] = {}  # source_master_partname → imported master part
 _allocated_partnames: set[str] = set()  # tracks names allocated this run
+# (id(target_package), content_type, sha256) → imported part, so media shared
+# by many cloned slides is stored once
+_imported_media_cache: dict[tuple[int, str, bytes], Part] = {}
+# Only these parts are plain, immutable payloads that are safe to share;
+# themes, charts and OLE objects still get their own copy per import.
+_SHARED_MEDIA_PREFIXES = ("image/", "video/", "audio/")
 
 
 def clear_clone_caches() -> None:
@@ -47,6 +61,7 @@ def clear_clone_caches() -> None:
     _imported_master_cache.clear()
     _allocated_partnames.clear()
     _target_layout_cache.clear()
+    _imported_media_cache.clear()
 
 
 def _get_source_prs(source_path: Path) -> Presentation:
@@ -645,15 +660,23 @@ def _import_media_part(source_part, target_package) -> Part:
     """Copy a media part (image, etc.) into the target package.
 
     Creates a new Part with a unique partname to avoid collisions
-    with existing media in the target presentation.
+    with existing media in the target presentation.  An image, video or
+    audio part whose bytes were already imported into this package is
+    reused instead of copied.
     """
+    blob = source_part.blob
+    content_type = source_part.content_type
+    key = None
+    if content_type.startswith(_SHARED_MEDIA_PREFIXES):
+        key = (id(target_package), content_type, hashlib.sha256(blob).digest())
+        imported = _imported_media_cache.get(key)
+        if imported is not None:
+            return imported
     new_partname = _unique_partname(target_package, source_part.partname)
-    return Part(
-        new_partname,
-        source_part.content_type,
-        target_package,
-        source_part.blob,
-    )
+    imported = Part(new_partname, content_type, target_package, blob)
+    if key is not None:
+        _imported_media_cache[key] = imported
+    return imported
 
 
 def _remap_rids(element, rid_map: dict[str, str]) -> None:
@@ -1016,6 +1039,72 @@ def _collect_background_image_rels(
                 logger.debug(f"Could not import background image: {e}")
 
 
+# ---------------------------------------------------------------------------
+# Saving
+# ---------------------------------------------------------------------------
+
+# Part extensions whose payload is already compressed; deflating them again
+# costs CPU for no size gain.
+_STORED_PART_EXTS = frozenset({"png", "jpg", "jpeg", "gif", "mp4", "m4v", "mov", "m4a", "mp3"})
+_XML_COMPRESSLEVEL = 1
+_SAVE_BUFSIZE = 1 << 20
+
+
+if PackageWriter is not None:
+
+    class _TunedZipPkgWriter(_ZipPkgWriter):
+        """Zip writer that stores media parts and deflates XML at a fast level."""
+
+        def write(self, pack_uri: PackURI, blob: bytes) -> None:
+            if pack_uri.ext.lower() in _STORED_PART_EXTS:
+                self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+            else:
+                self._zipf.writestr(
+                    pack_uri.membername, blob,
+                    compress_type=zipfile.ZIP_DEFLATED, compresslevel=_XML_COMPRESSLEVEL,
+                )
+
+    class _TunedPackageWriter(PackageWriter):
+        def _write(self) -> None:
+            with _TunedZipPkgWriter(self._pkg_file) as phys_writer:
+                self._write_content_types_stream(phys_writer)
+                self._write_pkg_rels(phys_writer)
+                self._write_parts(phys_writer)
+
+else:
+    _TunedPackageWriter = None
+
+
+def save_presentation(prs: Presentation, pkg_file: str | Path | IO[bytes]) -> None:
+    """Save ``prs`` like ``prs.save()``, but without re-deflating media.
+
+    Image and video parts are stored as-is and XML parts use zlib level 1,
+    which keeps the save step cheap on image-heavy decks.  Paths are written
+    through a 1 MiB buffer to cut the number of write syscalls.
+
+    The tuned writer subclasses private python-pptx classes; when those are
+    missing or have changed shape, this falls back to a plain ``prs.save()``.
+    """
+    is_path = isinstance(pkg_file, (str, Path))
+    if _TunedPackageWriter is not None:
+        package = prs.part.package
+        start = None if is_path or not pkg_file.seekable() else pkg_file.tell()
+        try:
+            parts = tuple(package.iter_parts())
+            if is_path:
+                with open(pkg_file, "wb", buffering=_SAVE_BUFSIZE) as f:
+                    _TunedPackageWriter.write(f, package._rels, parts)
+            else:
+                _TunedPackageWriter.write(pkg_file, package._rels, parts)
+            return
+        except AttributeError as e:
+            logger.warning(f"Tuned package writer unavailable ({e}), using prs.save()")
+            if start is not None:
+                pkg_file.seek(start)
+                pkg_file.truncate()
+    prs.save(str(pkg_file) if is_path else pkg_file)
+
+
 # ---------------------------------------------------------------------------
 # Utility
 # ---------------------------------------------------------------------------
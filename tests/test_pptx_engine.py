@@ -1,5 +1,6 @@
 """Tests for the PPTX engine operations."""
 
+import zipfile
 
 import pytest
 from pptx import Presentation
@@ -58,6 +59,72 @@ class TestSlideOperations:
         with pytest.raises(IndexError):
             clone_slide_from_template(target, template_path, 5)
 
+    def test_clone_reuses_identical_media(self, tmp_path):
+        from PIL import Image
+
+        from src.pptx_engine.slide_operations import (
+            clear_clone_caches,
+            clone_slide_as_is,
+            create_presentation,
+            save_presentation,
+        )
+
+        image_path = tmp_path / "pixel.png"
+        Image.new("RGB", (8, 8), "red").save(image_path)
+
+        template_prs = create_presentation()
+        slide = template_prs.slides.add_slide(template_prs.slide_layouts[6])
+        slide.shapes.add_picture(str(image_path), Inches(1), Inches(1))
+        template_path = tmp_path / "template.pptx"
+        template_prs.save(str(template_path))
+
+        clear_clone_caches()
+        try:
+            target = create_presentation()
+            for _ in range(3):
+                clone_slide_as_is(target, template_path, 0)
+            output = tmp_path / "cloned.pptx"
+            save_presentation(target, output)
+        finally:
+            clear_clone_caches()
+
+        with zipfile.ZipFile(output) as zf:
+            media = [n for n in zf.namelist() if n.startswith("ppt/media/")]
+        assert len(media) == 1
+        assert len(Presentation(str(output)).slides) == 3
+
+    def test_import_shares_only_media_parts(self):
+        from pptx.opc.package import Part
+        from pptx.opc.packuri import PackURI
+
+        from src.pptx_engine.slide_operations import (
+            _import_media_part,
+            clear_clone_caches,
+            create_presentation,
+        )
+
+        source_package = Presentation().part.package
+        image = Part(PackURI("/ppt/media/image1.png"), "image/png", source_package, b"png")
+        theme = Part(
+            PackURI("/ppt/theme/theme1.xml"),
+            "application/vnd.openxmlformats-officedocument.theme+xml",
+            source_package,
+            b"<a:theme/>",
+        )
+
+        clear_clone_caches()
+        try:
+            target_package = create_presentation().part.package
+            assert _import_media_part(image, target_package) is _import_media_part(
+                image, target_package
+            )
+            first_theme = _import_media_part(theme, target_package)
+            second_theme = _import_media_part(theme, target_package)
+        finally:
+            clear_clone_caches()
+        assert first_theme is not second_theme
+        assert first_theme.partname != second_theme.partname
+
 
 class TestTextOperations:
     def test_add_textbox(self):
@@ -186,3 +253,69 @@ class TestEndToEnd:
         # Verify we can reopen it
         reopened = Presentation(str(output))
         assert len(reopened.slides) == 2
+
+    def test_save_presentation_stores_media(self, tmp_path):
+        from PIL import Image
+
+        from src.pptx_engine.slide_operations import (
+            add_blank_slide,
+            create_presentation,
+            save_presentation,
+        )
+
+        image_path = tmp_path / "pixel.png"
+        Image.new("RGB", (8, 8), "red").save(image_path)
+
+        prs = create_presentation()
+        slide = add_blank_slide(prs)
+        slide.shapes.add_picture(str(image_path), Inches(1), Inches(1))
+
+        output = tmp_path / "saved.pptx"
+        save_presentation(prs, output)
+
+        with zipfile.ZipFile(output) as zf:
+            infos = {info.filename: info for info in zf.infolist()}
+        media = [name for name in infos if name.startswith("ppt/media/")]
+        assert media
+        assert all(infos[name].compress_type == zipfile.ZIP_STORED for name in media)
+        assert infos["ppt/presentation.xml"].compress_type == zipfile.ZIP_DEFLATED
+
+        reopened = Presentation(str(output))
+        assert len(reopened.slides) == 1
+
+    def test_save_presentation_falls_back_without_tuned_writer(self, tmp_path, monkeypatch):
+        from src.pptx_engine import slide_operations
+        from src.pptx_engine.slide_operations import add_blank_slide, create_presentation
+
+        prs = create_presentation()
+        add_blank_slide(prs)
+
+        monkeypatch.setattr(slide_operations, "_TunedPackageWriter", None)
+        output = tmp_path / "saved.pptx"
+        slide_operations.save_presentation(prs, output)
+
+        assert len(Presentation(str(output)).slides) == 1
+
+    def test_save_presentation_falls_back_on_changed_private_api(self, monkeypatch):
+        import io
+
+        from src.pptx_engine import slide_operations
+        from src.pptx_engine.slide_operations import add_blank_slide, create_presentation
+
+        class _ChangedPackageWriter(slide_operations._TunedPackageWriter):
+            def _write_pkg_rels(self, phys_writer):
+                raise AttributeError("_write_pkg_rels")
+
+        prs = create_presentation()
+        add_blank_slide(prs)
+
+        monkeypatch.setattr(slide_operations, "_TunedPackageWriter", _ChangedPackageWriter)
+        buf = io.BytesIO()
+        slide_operations.save_presentation(prs, buf)
+
+        # The abandoned partial archive is truncated away before prs.save()
+        assert buf.getvalue().count(b"PK\x05\x06") == 1  # one end-of-central-dir record
+        with zipfile.ZipFile(buf) as zf:
+            assert zf.testzip() is None
+        buf.seek(0)
+        assert len(Presentation(buf).slides) == 1
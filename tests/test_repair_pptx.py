@@ -0,0 +1,336 @@
+"""Tests for the PPTX repair script."""
+
+import os
+import random
+import stat
+import zipfile
+
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Inches
+
+_CT_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+
+
+def _pixel_images(tmp_path, count=2):
+    """Write ``count`` distinct 8x8 PNGs and return their paths."""
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"pixel{i}.png"
+        Image.new("RGB", (8, 8), (255, 40 * i, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+def _build_deck(tmp_path, image_paths=None, notes=False):
+    """Save a deck with one picture per slide and return its path."""
+    if image_paths is None:
+        image_paths = _pixel_images(tmp_path)
+    prs = Presentation()
+    for image_path in image_paths:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_picture(str(image_path), Inches(1), Inches(1))
+        if notes:
+            slide.notes_slide.notes_text_frame.text = "Speaker notes"
+    path = tmp_path / "deck.pptx"
+    prs.save(str(path))
+    return path
+
+
+def _read_entries(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def _rewrite_entries(path, changes):
+    """Rewrite the archive with entries replaced (bytes) or dropped (None)."""
+    entries = _read_entries(path)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in entries.items():
+            data = changes.get(name, data)
+            if data is not None:
+                zf.writestr(name, data)
+
+
+def _media_names(entries):
+    return sorted(n.split("/")[-1] for n in entries if n.startswith("ppt/media/"))
+
+
+def _content_type(entries, part_name):
+    """Resolve a part's content type the way a consumer would: Override, then Default."""
+    root = etree.fromstring(entries["[Content_Types].xml"])
+    for override in root.iter(f"{_CT_NS}Override"):
+        if override.get("PartName") == part_name:
+            return override.get("ContentType")
+    ext = part_name.rsplit(".", 1)[-1].lower()
+    for default in root.iter(f"{_CT_NS}Default"):
+        if default.get("Extension").lower() == ext:
+            return default.get("ContentType")
+    return None
+
+
+def _noise_gif(tmp_path, seed=0):
+    """A two-frame GIF well over the 100 KB compression threshold."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    frames = [Image.frombytes("P", (640, 640), rng.randbytes(640 * 640)) for _ in range(2)]
+    path = tmp_path / f"noise{seed}.gif"
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    return path
+
+
+def _photo_png(tmp_path):
+    """An oversized RGB PNG with photographic colour counts, so it becomes a JPEG."""
+    from PIL import Image
+
+    rng = random.Random(1)
+    path = tmp_path / "photo.png"
+    Image.frombytes("RGB", (2400, 400), rng.randbytes(2400 * 400 * 3)).save(path)
+    return path
+
+
+def _kill_worker(job):
+    """Stand-in for _compress_one that takes its worker process down."""
+    os._exit(1)
+
+
+def _no_process_pool():
+    raise OSError("sem_open is not available")
+
+
+class TestPngLevel:
+    def test_unset_or_malformed_falls_back_to_default(self, monkeypatch):
+        from scripts.repair_pptx import _png_level_from_env
+
+        monkeypatch.delenv("WARHOL_PNG_LEVEL", raising=False)
+        assert _png_level_from_env() == 1
+        monkeypatch.setenv("WARHOL_PNG_LEVEL", "fast")
+        assert _png_level_from_env() == 1
+
+    def test_level_is_clamped(self, monkeypatch):
+        from scripts.repair_pptx import _png_level_from_env
+
+        monkeypatch.setenv("WARHOL_PNG_LEVEL", "6")
+        assert _png_level_from_env() == 6
+        monkeypatch.setenv("WARHOL_PNG_LEVEL", "42")
+        assert _png_level_from_env() == 9
+        monkeypatch.setenv("WARHOL_PNG_LEVEL", "-3")
+        assert _png_level_from_env() == 0
+
+
+class TestRepairRoundTrip:
+    def test_repaired_archive_is_valid(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path)
+        output = tmp_path / "repaired.pptx"
+        repair_pptx(source, output)
+
+        with zipfile.ZipFile(output) as zf:
+            assert zf.testzip() is None
+        assert len(Presentation(str(output)).slides) == 2
+
+    def test_stream_copy_fallback_matches_raw_copy(self, tmp_path, monkeypatch):
+        """Without zipfile internals every entry is re-compressed, same content."""
+        import scripts.repair_pptx as repair
+
+        source = _build_deck(tmp_path)
+        raw_output = tmp_path / "raw.pptx"
+        repair.repair_pptx(source, raw_output)
+
+        monkeypatch.setattr(repair, "_can_raw_copy", lambda zf_in, zf_out: False)
+        streamed_output = tmp_path / "streamed.pptx"
+        repair.repair_pptx(source, streamed_output)
+
+        with zipfile.ZipFile(streamed_output) as zf:
+            assert zf.testzip() is None
+        assert _read_entries(streamed_output) == _read_entries(raw_output)
+        assert len(Presentation(str(streamed_output)).slides) == 2
+
+
+class TestRepairFixes:
+    def test_duplicate_media_remapped_in_slide_rels(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path)
+        entries = _read_entries(source)
+        first, second = (f"ppt/media/{n}" for n in _media_names(entries))
+        _rewrite_entries(source, {second: entries[first]})
+
+        output = tmp_path / "repaired.pptx"
+        stats = repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        dropped = second.split("/")[-1]
+        assert stats["media_deduplicated"] == 1
+        assert _media_names(repaired) == [first.split("/")[-1]]
+        slide_rels = [repaired[n] for n in repaired if n.startswith("ppt/slides/_rels/")]
+        assert all(b"media/" + first.split("/")[-1].encode() in rels for rels in slide_rels)
+        assert not any(dropped.encode() in rels for rels in slide_rels)
+        assert len(Presentation(str(output)).slides) == 2
+
+    def test_gif_converted_to_png_content_type(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path, [_noise_gif(tmp_path)])
+        gif_name = _media_names(_read_entries(source))[0]
+        output = tmp_path / "repaired.pptx"
+        stats = repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        png_name = gif_name.rsplit(".", 1)[0] + ".png"
+        assert stats["media_compressed"] == 1
+        assert _media_names(repaired) == [png_name]
+        assert _content_type(repaired, f"/ppt/media/{png_name}") == "image/png"
+        assert f"media/{png_name}".encode() in repaired["ppt/slides/_rels/slide1.xml.rels"]
+        assert len(Presentation(str(output)).slides) == 1
+
+    def test_photographic_png_converted_to_jpg_content_type(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path, [_photo_png(tmp_path)])
+        png_name = _media_names(_read_entries(source))[0]
+        output = tmp_path / "repaired.pptx"
+        repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        jpg_name = png_name.rsplit(".", 1)[0] + ".jpg"
+        assert _media_names(repaired) == [jpg_name]
+        assert _content_type(repaired, f"/ppt/media/{jpg_name}") == "image/jpeg"
+        assert repaired[f"ppt/media/{jpg_name}"][:3] == b"\xff\xd8\xff"
+        assert f"media/{jpg_name}".encode() in repaired["ppt/slides/_rels/slide1.xml.rels"]
+
+    def test_missing_notes_master_id_lst_added(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path, notes=True)
+        assert b"notesMasterIdLst" not in _read_entries(source)["ppt/presentation.xml"]
+
+        output = tmp_path / "repaired.pptx"
+        repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        rels = etree.fromstring(repaired["ppt/_rels/presentation.xml.rels"])
+        nm_rid = next(
+            rel.get("Id") for rel in rels if rel.get("Type").endswith("/notesMaster")
+        )
+        pres = repaired["ppt/presentation.xml"]
+        assert f'<p:notesMasterIdLst><p:notesMasterId r:id="{nm_rid}"/>'.encode() in pres
+        assert len(Presentation(str(output)).slides) == 2
+
+    def test_missing_docprops_injected(self, tmp_path):
+        from scripts.repair_pptx import repair_pptx
+
+        source = _build_deck(tmp_path)
+        _rewrite_entries(source, {"docProps/core.xml": None, "docProps/app.xml": None})
+
+        output = tmp_path / "repaired.pptx"
+        repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        assert "docProps/core.xml" in repaired
+        assert "docProps/app.xml" in repaired
+        assert b'Target="docProps/core.xml"' in repaired["_rels/.rels"]
+        assert _content_type(repaired, "/docProps/core.xml").endswith("core-properties+xml")
+        assert _content_type(repaired, "/docProps/app.xml").endswith("extended-properties+xml")
+        assert len(Presentation(str(output)).slides) == 2
+
+
+class TestRepairCompressionFailures:
+    def test_no_compress_never_creates_process_pool(self, tmp_path, monkeypatch):
+        import scripts.repair_pptx as repair
+
+        monkeypatch.setattr(repair, "ProcessPoolExecutor", _no_process_pool)
+        source = _build_deck(tmp_path, [_noise_gif(tmp_path, 0), _noise_gif(tmp_path, 1)])
+        output = tmp_path / "repaired.pptx"
+        stats = repair.repair_pptx(source, output, compress_images=False)
+
+        assert stats["media_compressed"] == 0
+        assert len(Presentation(str(output)).slides) == 2
+
+    def test_compresses_in_process_without_process_pool(self, tmp_path, monkeypatch):
+        import scripts.repair_pptx as repair
+
+        monkeypatch.setattr(repair, "ProcessPoolExecutor", _no_process_pool)
+        source = _build_deck(tmp_path, [_noise_gif(tmp_path, 0), _noise_gif(tmp_path, 1)])
+        output = tmp_path / "repaired.pptx"
+        stats = repair.repair_pptx(source, output)
+
+        assert stats["media_compressed"] == 2
+        assert len(Presentation(str(output)).slides) == 2
+
+    def test_broken_worker_pool_keeps_other_repairs(self, tmp_path, monkeypatch):
+        import scripts.repair_pptx as repair
+
+        monkeypatch.setattr(repair, "_compress_one", _kill_worker)
+        images = [_noise_gif(tmp_path, 0), _noise_gif(tmp_path, 1)]
+        source = _build_deck(tmp_path, images, notes=True)
+        before = _read_entries(source)
+        output = tmp_path / "repaired.pptx"
+        stats = repair.repair_pptx(source, output)
+
+        repaired = _read_entries(output)
+        assert stats["media_compressed"] == 0
+        assert _media_names(repaired) == _media_names(before)
+        assert b"notesMasterIdLst" in repaired["ppt/presentation.xml"]
+        with zipfile.ZipFile(output) as zf:
+            assert zf.testzip() is None
+
+
+class TestRepairCli:
+    def test_no_compress_keeps_images(self, tmp_path, monkeypatch):
+        from scripts import repair_pptx
+
+        source = _build_deck(tmp_path, [_noise_gif(tmp_path)])
+        before = _read_entries(source)
+        output = tmp_path / "repaired.pptx"
+        monkeypatch.setattr(
+            "sys.argv", ["repair_pptx.py", str(source), "-o", str(output), "--no-compress"]
+        )
+        repair_pptx.main()
+
+        repaired = _read_entries(output)
+        gif_name = _media_names(before)[0]
+        assert _media_names(repaired) == [gif_name]
+        assert repaired[f"ppt/media/{gif_name}"] == before[f"ppt/media/{gif_name}"]
+
+    def test_in_place_repair(self, tmp_path, monkeypatch):
+        from scripts import repair_pptx
+
+        source = _build_deck(tmp_path, notes=True)
+        monkeypatch.setattr("sys.argv", ["repair_pptx.py", str(source)])
+        repair_pptx.main()
+
+        assert b"notesMasterIdLst" in _read_entries(source)["ppt/presentation.xml"]
+        assert sorted(p.name for p in tmp_path.glob("*.pptx*")) == ["deck.pptx"]
+        with zipfile.ZipFile(source) as zf:
+            assert zf.testzip() is None
+        assert len(Presentation(str(source)).slides) == 2
+
+    def test_in_place_repair_keeps_file_mode(self, tmp_path, monkeypatch):
+        from scripts import repair_pptx
+
+        source = _build_deck(tmp_path)
+        os.chmod(source, 0o640)
+        monkeypatch.setattr("sys.argv", ["repair_pptx.py", str(source)])
+        repair_pptx.main()
+
+        assert stat.S_IMODE(source.stat().st_mode) == 0o640
+
+    def test_existing_output_keeps_its_own_file_mode(self, tmp_path, monkeypatch):
+        from scripts import repair_pptx
+
+        source = _build_deck(tmp_path)
+        os.chmod(source, 0o644)
+        output = tmp_path / "existing.pptx"
+        output.write_bytes(b"")
+        os.chmod(output, 0o600)
+        monkeypatch.setattr("sys.argv", ["repair_pptx.py", str(source), "-o", str(output)])
+        repair_pptx.main()
+
+        assert stat.S_IMODE(output.stat().st_mode) == 0o600
+        assert stat.S_IMODE(source.stat().st_mode) == 0o644
+        assert len(Presentation(str(output)).slides) == 2
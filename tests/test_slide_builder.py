@@ -0,0 +1,36 @@
+"""Tests for the slide builder agent."""
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Inches, Pt
+
+
+class TestPopulateClonedSlide:
+    def test_shape_without_txbody(self):
+        """A <p:sp> with no <p:txBody> still reports a text frame; it must not crash."""
+        from src.agents.slide_builder import SlideBuilderAgent
+        from src.schemas.design_system import DesignSystem
+        from src.schemas.slide_schema import SlideSpec, SlideType
+
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        title = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1.5))
+        run = title.text_frame.paragraphs[0].add_run()
+        run.text = "Template title"
+        run.font.size = Pt(40)
+        rect = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE, Inches(0.5), Inches(3), Inches(9), Inches(3)
+        )
+        rect._element.remove(rect._element.txBody)
+        assert rect.has_text_frame and rect._element.txBody is None
+
+        spec = SlideSpec(
+            slide_number=1,
+            slide_type=SlideType.CONTENT,
+            intent="Test",
+            title="New title",
+        )
+        SlideBuilderAgent()._populate_cloned_slide(slide, spec, DesignSystem())
+
+        assert title.text_frame.text == "New title"
+        assert "Template title" not in [s.text_frame.text for s in slide.shapes]
@@ -0,0 +1,51 @@
+"""Tests for the content spreading script."""
+
+import pytest
+
+_DECK = {
+    "title": "Café roadmap — 2026",
+    "slides": [
+        {
+            "slide_number": 1,
+            "title": "Überblick: naïve ideas",
+            "content_blocks": [
+                {"type": "bullet_list", "items": ["日本語のテキスト", "Emoji 🚀 launch", "Ελληνικά"]},
+            ],
+            "speaker_notes": "",
+        },
+    ],
+}
+
+
+class TestJsonIO:
+    @pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+    def test_round_trip_non_ascii(self, tmp_path, monkeypatch, backend):
+        import scripts.spread_content as spread
+
+        if backend == "orjson" and spread.orjson is None:
+            pytest.skip("orjson not installed")
+        if backend == "stdlib":
+            monkeypatch.setattr(spread, "orjson", None)
+
+        path = tmp_path / "deck.json"
+        spread._write_json(path, _DECK)
+
+        text = path.read_text(encoding="utf-8")
+        assert "Café roadmap — 2026" in text
+        assert "日本語のテキスト" in text
+        assert "\\u" not in text
+        assert spread._read_json(path) == _DECK
+
+    def test_backends_write_identical_bytes(self, tmp_path, monkeypatch):
+        import scripts.spread_content as spread
+
+        if spread.orjson is None:
+            pytest.skip("orjson not installed")
+        fast_path = tmp_path / "orjson.json"
+        spread._write_json(fast_path, _DECK)
+
+        monkeypatch.setattr(spread, "orjson", None)
+        stdlib_path = tmp_path / "stdlib.json"
+        spread._write_json(stdlib_path, _DECK)
+
+        assert fast_path.read_bytes() == stdlib_path.read_bytes()